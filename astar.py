@@ -1,6 +1,6 @@
 # Importing required modules
 from pyMaze import maze, agent, COLOR, textLabel  # For maze generation and visualization
-from queue import PriorityQueue  # For implementing the open list in A*
+from search import bestFirstSearch, bucketSearch, bidirectionalSearch, corridorSearch  # Shared A* engines
 
 def h(cell1, cell2):
     """
@@ -17,77 +17,72 @@ def h(cell1, cell2):
     x2, y2 = cell2
     return abs(x1 - x2) + abs(y1 - y2)
 
-def aStar(m, start=None):
+def aStar(m, start=None, stats=None):
     """
     Perform the A* search algorithm on the maze to find a path from start to goal.
 
     Parameters:
         m (maze): The maze object.
         start (tuple): Starting cell coordinates (row, col). Defaults to the bottom-right cell of the maze.
+        stats (searchStats): Optional instrument.searchStats to fill in with counters and timings.
 
     Returns:
         tuple:
-            searchPath (list): Sequence of cells explored during the search.
+            searchPath (list): Sequence of cells expanded during the search.
             aPath (dict): A dictionary mapping each visited cell to its predecessor.
             fwdPath (dict): A dictionary mapping the shortest path from the start cell to the goal cell.
     """
-    # Default start cell to bottom-right corner if not provided
-    if start is None:
-        start = (m.rows, m.cols)
-
-    # Priority queue for open nodes
-    open = PriorityQueue()
-    open.put((h(start, m._goal), h(start, m._goal), start))  # (f_score, heuristic, cell)
-
-    # Path and cost tracking
-    aPath = {}
-    g_score = {start: 0}  # Cost from start to the current cell
-    f_score = {start: h(start, m._goal)}  # Estimated total cost through the current cell
-
-    # List to track explored cells
-    searchPath = [start]
-
-    while not open.empty():
-        # Get the cell with the lowest f-score
-        currCell = open.get()[2]
-        searchPath.append(currCell)
-
-        # Check if the goal has been reached
-        if currCell == m._goal:
-            break
-
-        # Explore neighbors of the current cell
-        for d in 'ESNW':  # Directions: East, South, North, West
-            if m.maze_map[currCell][d]:  # Check if movement in direction `d` is possible
-                # Determine the child cell based on the direction
-                if d == 'E':
-                    childCell = (currCell[0], currCell[1] + 1)
-                elif d == 'W':
-                    childCell = (currCell[0], currCell[1] - 1)
-                elif d == 'N':
-                    childCell = (currCell[0] - 1, currCell[1])
-                elif d == 'S':
-                    childCell = (currCell[0] + 1, currCell[1])
-
-                # Calculate tentative g and f scores for the child cell
-                temp_g_score = g_score.get(currCell, float('inf')) + 1
-                temp_f_score = temp_g_score + h(childCell, m._goal)
-
-                # Update if a better path is found
-                if temp_f_score < f_score.get(childCell, float('inf')):
-                    aPath[childCell] = currCell  # Map child cell to its parent
-                    g_score[childCell] = temp_g_score
-                    f_score[childCell] = temp_f_score
-                    open.put((f_score[childCell], h(childCell, m._goal), childCell))
-
-    # Reconstruct the shortest path from goal to start
-    fwdPath = {}
-    cell = m._goal
-    while cell != start:
-        fwdPath[aPath[cell]] = cell
-        cell = aPath[cell]
-
-    return searchPath, aPath, fwdPath
+    return bestFirstSearch(m, start, h, stats)
+
+def bucketAStar(m, start=None, stats=None):
+    """
+    Perform the A* search with a bucket queue (Dial's algorithm) instead of the heap of aStar.
+    It is faster than aStar on large mazes with loops and slower on perfect mazes, see search.bucketSearch.
+
+    Parameters:
+        m (maze): The maze object.
+        start (tuple): Starting cell coordinates (row, col). Defaults to the bottom-right cell of the maze.
+        stats (searchStats): Optional instrument.searchStats to fill in with counters and timings.
+
+    Returns:
+        tuple:
+            searchPath (list): Sequence of cells expanded during the search.
+            aPath (dict): A dictionary mapping each visited cell to its predecessor.
+            fwdPath (dict): A dictionary mapping the shortest path from the start cell to the goal cell.
+    """
+    return bucketSearch(m, start, h, stats)
+
+def biAStar(m, start=None):
+    """
+    Perform a bidirectional A* search, from start towards the goal and from the goal towards start at the same time.
+
+    Parameters:
+        m (maze): The maze object.
+        start (tuple): Starting cell coordinates (row, col). Defaults to the bottom-right cell of the maze.
+
+    Returns:
+        tuple:
+            searchPath (list): Sequence of cells expanded by both searches, interleaved.
+            aPath (dict): A dictionary mapping each visited cell to the cell it was reached from.
+            fwdPath (dict): A dictionary mapping the shortest path from the start cell to the goal cell.
+    """
+    return bidirectionalSearch(m, start, h)
+
+def corridorAStar(m, start=None):
+    """
+    Perform the A* search on the corridor graph of the maze, expanding only its junctions.
+
+    Parameters:
+        m (maze): The maze object.
+        start (tuple): Starting cell coordinates (row, col). Defaults to the bottom-right cell of the maze.
+
+    Returns:
+        tuple:
+            searchPath (list): Sequence of junction cells expanded during the search.
+            aPath (dict): A dictionary mapping each reached junction to the one it was reached from.
+            fwdPath (dict): A dictionary mapping the shortest path from the start cell to the goal cell.
+    """
+    return corridorSearch(m, start, h)
 
 if __name__ == '__main__':
     """
@@ -3,6 +3,7 @@ from astar import aStar  # Importing the A-Star algorithm with Manhattan heurist
 from astar2 import aStar2  # Importing the A-Star algorithm with Euclidean heuristic
 from pyMaze import maze, agent, COLOR, textLabel  # Importing pyMaze for maze creation and visualization
 from timeit import timeit  # Importing timeit for performance measurement
+from instrument import memoryProfile  # Importing memoryProfile for memory measurement
 
 # Initialize counters for comparison results
 f1, f2, f3 = 0, 0, 0  # Counters for final path length comparison
@@ -10,8 +11,8 @@ s1, s2, s3 = 0, 0, 0  # Counters for search path length comparison
 
 # Loop to test and compare algorithms over 100 iterations
 for _ in range(100):
-    # Create a new maze object with dimensions 20x30 and 100% loop connectivity
-    myMaze = maze(20, 30)
+    # Create a new headless maze object with dimensions 20x30 and 100% loop connectivity
+    myMaze = maze(20, 30, headless=True)
     myMaze.CreateMaze(loopPercent=100)
 
     # Run A-Star algorithm with Manhattan heuristic
@@ -49,3 +50,10 @@ print('Search Path Comparison Result')
 print(f'Both have same Search Path length for {s1} times.')  # Equal search path lengths
 print(f'Manhattan has lesser Search Path length for {s2} times.')  # Manhattan searches less
 print(f'Euclidean has lesser Search Path length for {s3} times.')  # Euclidean searches less
+
+print('--------------------------------------------')
+
+# Print the peak memory of both heuristics on the last maze
+print('Peak Memory Comparison Result')
+print(f'Manhattan peaks at {memoryProfile(aStar, myMaze)[1].peakPerCell:.1f} bytes per cell.')
+print(f'Euclidean peaks at {memoryProfile(aStar2, myMaze)[1].peakPerCell:.1f} bytes per cell.')
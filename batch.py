@@ -0,0 +1,125 @@
+# Answering many (start, goal) queries on one maze over a pool of worker processes
+import os  # For the default number of workers
+import copy  # Shallow copy of the maze for in-process solving
+from time import perf_counter  # Per query timing
+from multiprocessing import Pool  # Processes, the solvers are CPU bound pure Python
+from pyMaze import maze  # For shared memory mazes and the example below
+from astar import aStar, bucketAStar, biAStar, corridorAStar
+from bfs import BFS, biBFS
+from dfs import DFS
+
+# Solvers selectable by name, any other picklable solver(m, start) function works as well
+SOLVERS = {
+    'astar': aStar,
+    'bucket': bucketAStar,
+    'biastar': biAStar,
+    'corridor': corridorAStar,
+    'bfs': BFS,
+    'bibfs': biBFS,
+    'dfs': DFS,
+}
+
+# The maze, solver and result size of a worker process, sent once when the worker starts
+_maze = None
+_solver = None
+_full = True
+
+def _initWorker(m, solver, full):
+    global _maze, _solver, _full
+    _maze, _solver, _full = m, solver, full
+
+def _solve(m, solver, chunk, full):
+    """
+    Solve a chunk of (index, start, goal) queries on the maze.
+
+    Returns:
+        list: One (index, searchPath, parentMap, fwdPath, seconds) tuple per query.
+    """
+    results = []
+    for index, start, goal in chunk:
+        m._goal = goal
+        t = perf_counter()
+        searchPath, parentMap, fwdPath = solver(m, start)
+        t = perf_counter() - t
+        if not full:
+            searchPath, parentMap = len(searchPath), None
+        results.append((index, searchPath, parentMap, fwdPath, t))
+    return results
+
+def _solveChunk(chunk):
+    # Runs in a worker process
+    return _solve(_maze, _solver, chunk, _full)
+
+def solveMany(m, queries, algorithm='astar', workers=None, chunkSize=None, ordered=True, full=True, shared=False):
+    """
+    Solve many (start, goal) queries on one maze, spread over a pool of worker processes.
+
+    The maze is pickled once per worker (headless, see maze.__getstate__), the queries are sent in
+    chunks so the cost of talking to the workers is paid per chunk rather than per query.
+
+    Parameters:
+        m (maze): The maze object, it is not changed.
+        queries (iterable): (start, goal) pairs of cells, a goal of None means the goal of the maze.
+        algorithm (str or callable): A name of SOLVERS ('astar', 'bfs', 'dfs', ...) or a solver function
+            solver(m, start) defined at the top level of a module (so that it can be pickled).
+        workers (int): Number of worker processes. Defaults to os.cpu_count(). With 1 the queries are
+            solved in this process, without a pool.
+        chunkSize (int): Queries per chunk. Defaults to about four chunks per worker.
+        ordered (bool): Yield the results in the order of the queries (True) or as soon as each
+            chunk is done (False).
+        full (bool): With False only the length of searchPath is returned and parentMap is None,
+            much less to send back from the workers when the search maps are not needed.
+        shared (bool): Publish the walls once in shared memory (maze.share) and let every worker
+            attach to them, instead of sending each worker its own copy of the maze.
+
+    Returns:
+        generator: (index, searchPath, parentMap, fwdPath, seconds) for every query, index being its
+            position in queries and seconds the time its solver took.
+    """
+    solver = SOLVERS[algorithm.lower()] if isinstance(algorithm, str) else algorithm
+    goal = m._goal
+    queries = [(i, tuple(start), goal if g is None else tuple(g)) for i, (start, g) in enumerate(queries)]
+    workers = workers or os.cpu_count() or 1
+    if chunkSize is None:
+        chunkSize = max(1, -(-len(queries) // (workers * 4)))
+    chunks = [queries[i:i + chunkSize] for i in range(0, len(queries), chunkSize)]
+
+    if workers == 1:
+        # No pool, solved here on a headless shallow copy (see maze.__getstate__) that shares the walls
+        # and adjacency of the maze, so the goal of each query never shows on the maze of the caller
+        view = copy.copy(m)
+        view.markCells = []  # Cells DFS marks go on the copy, not on the maze of the caller
+        for chunk in chunks:
+            yield from _solve(view, solver, chunk, full)
+        return
+
+    block = m.share() if shared else None
+    try:
+        # An attached maze is pickled as the name of the shared memory block only
+        view = maze.attach(block.name) if shared else m
+        with Pool(workers, _initWorker, (view, solver, full)) as pool:
+            mapper = pool.imap if ordered else pool.imap_unordered
+            for results in mapper(_solveChunk, chunks):
+                yield from results
+    finally:
+        if block is not None:
+            view = None
+            block.close()
+            block.unlink()
+
+if __name__ == '__main__':
+    """
+    Main block to solve a batch of random queries on a generated maze with all the processors.
+    """
+    import random
+    m = maze(100, 100, headless=True)
+    m.CreateMaze(loopPercent=30, seed=1)
+
+    rng = random.Random(1)
+    cell = lambda: (rng.randint(1, m.rows), rng.randint(1, m.cols))
+    queries = [(cell(), cell()) for _ in range(2000)]
+
+    t = perf_counter()
+    results = list(solveMany(m, queries, 'astar', full=False))
+    t = perf_counter() - t
+    print(len(results), 'queries in', round(t, 2), 's, solver time', round(sum(r[4] for r in results), 2), 's')
@@ -0,0 +1,238 @@
+# Benchmark of the solvers on fixed seeded mazes, with stored baselines and a regression gate
+#
+# The baseline is benchmark_baseline.json, next to this file. python benchmark.py --check compares a
+# run with it and exits with status 1 if the fastest sample of a solver got slower than --threshold
+# allows (a plain run only reports). The fastest sample is the one least disturbed by the rest of the
+# machine, but on a shared machine even those minimums move by 25% and more for minutes at a time, so
+# a case over the threshold is measured again (--retries times) and only fails if it is slow on every
+# attempt, at its fastest sample of all of them. Timings only compare on the same machine, the
+# baseline keeps the reference machine it was taken on ('machine') and a run on another one says so.
+# After an intended change in speed, or to gate on a new reference machine, store a new baseline
+# with the full suite over a few runs (python benchmark.py --save-baseline --runs 3), so that it
+# does not keep the minimums of a fast minute of the machine, and commit it.
+import os  # Path of the stored baseline
+import gc  # The garbage collector is kept out of the timed runs
+import sys  # Exit status of the regression gate
+import json  # Results and baselines are JSON files
+import math  # Rank of the percentiles
+import statistics  # Median of the samples
+import platform  # Machine description stored with the results
+import argparse  # Command line
+from datetime import datetime  # Date of the results
+from time import perf_counter  # Timing of every sample
+from pyMaze import maze
+from bfs import BFS
+from dfs import DFS
+from astar import aStar, bucketAStar
+from astar2 import aStar2
+from astar3 import aStar as aStar3
+from instrument import memoryProfile, byStructure
+
+# Solvers of the suite, by the name their results are stored under
+SOLVERS = {
+    'BFS': BFS,
+    'DFS': DFS,
+    'aStar': aStar,
+    'bucketAStar': bucketAStar,
+    'aStar2': aStar2,
+    'astar3.aStar': aStar3,
+}
+SIZES = [(10, 10), (50, 50), (100, 100), (300, 300), (1000, 1000)]
+LOOP_PERCENTS = [0, 30, 100]
+SEED = 1
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_baseline.json')
+
+def _percentile(values, q):
+    # Nearest rank percentile of the sorted values
+    return values[max(0, math.ceil(q / 100 * len(values)) - 1)]
+
+def measure(run, warmup=1, repeats=7, maxTime=5.0, minSamples=5):
+    """
+    Time a function over repeated samples.
+
+    The function is run warmup times untimed first. Then the samples are taken, each after a full
+    garbage collection and with the collector disabled while it runs. Sampling stops after repeats
+    samples, or earlier once maxTime seconds are spent (but never with less than minSamples samples).
+
+    Returns:
+        list: The sorted sample times in seconds.
+    """
+    for _ in range(warmup):
+        run()
+    samples = []
+    spent = 0.0
+    enabled = gc.isenabled()
+    try:
+        while len(samples) < repeats and (len(samples) < minSamples or spent < maxTime):
+            gc.collect()
+            gc.disable()
+            t = perf_counter()
+            run()
+            t = perf_counter() - t
+            if enabled:
+                gc.enable()
+            samples.append(t)
+            spent += t
+    finally:
+        if enabled:
+            gc.enable()
+    return sorted(samples)
+
+def benchmark(sizes=SIZES, loopPercents=LOOP_PERCENTS, solvers=None, seed=SEED, warmup=1, repeats=7,
+              maxTime=5.0, memory=False, log=print):
+    """
+    Run the solvers on seeded mazes of every size and loopPercent, from the bottom-right cell to (1, 1).
+
+    Parameters:
+        sizes (iterable): (rows, cols) of the mazes.
+        loopPercents (iterable): loopPercent values of the mazes.
+        solvers (iterable): Names of SOLVERS to run. Defaults to all of them.
+        seed (int): Seed of every maze.
+        warmup, repeats, maxTime: See measure.
+        memory (bool): Also profile the memory of every case once (see instrument.memoryProfile),
+            outside of the timed runs.
+        log (callable): Called with a line of text per result, None to stay quiet.
+
+    Returns:
+        dict: {'machine': ..., 'results': {name: result}}, the name being 'solver/rowsxcols/loopPercent'
+            and the result holding the median, p95 and min latency in seconds, the samples taken, the
+            cells expanded and the cells expanded per second (at the median). With memory, also the
+            peak and retained bytes, per cell as well, and the peak bytes of every structure.
+    """
+    results = {}
+    for rows, cols in sizes:
+        for loopPercent in loopPercents:
+            m = maze(rows, cols, headless=True)
+            m.CreateMaze(1, 1, loopPercent=loopPercent, seed=seed)
+            m.adjacency()  # Built once per maze, like any repeated solve
+            for name in solvers or SOLVERS:
+                solver = SOLVERS[name]
+                expansions = len(solver(m)[0])
+
+                def run():
+                    m.markCells = []  # DFS marks cells on the maze, do not let them pile up
+                    solver(m)
+
+                samples = measure(run, warmup, repeats, maxTime)
+                median = statistics.median(samples)
+                key = f'{name}/{rows}x{cols}/{loopPercent}'
+                results[key] = {'median': median, 'p95': _percentile(samples, 95), 'min': samples[0],
+                                'samples': len(samples), 'expansions': expansions,
+                                'nodesPerSecond': expansions / median}
+                line = (f'{key:<28}median {median * 1000:10.3f} ms   p95 {results[key]["p95"] * 1000:10.3f} ms'
+                        f'   {expansions:>8} cells   {expansions / median:12,.0f} cells/s')
+                if memory:
+                    m.markCells = []
+                    report = memoryProfile(solver, m)[1]
+                    results[key].update({'peakBytes': report.peak, 'retainedBytes': report.retained,
+                                         'peakBytesPerCell': report.peakPerCell,
+                                         'retainedBytesPerCell': report.retainedPerCell,
+                                         'peakBy': byStructure(report.peakBy)})
+                    line += f'   {report.peakPerCell:8.1f} B/cell peak   {report.retainedPerCell:8.1f} B/cell kept'
+                if log:
+                    log(line)
+            # The bucket queue against the heap on the same maze, on their fastest samples
+            fast, slow = results.get(f'bucketAStar/{rows}x{cols}/{loopPercent}'), results.get(f'aStar/{rows}x{cols}/{loopPercent}')
+            if log and fast and slow:
+                log(f'{"":<28}bucketAStar is {slow["min"] / fast["min"]:.2f}x the speed of aStar (fastest samples)')
+    machine = {'python': platform.python_version(), 'implementation': platform.python_implementation(),
+               'platform': platform.platform(), 'processor': platform.processor(),
+               'date': datetime.now().isoformat(timespec='seconds')}
+    return {'machine': machine, 'results': results}
+
+def compare(current, baseline, threshold=0.5):
+    """
+    Compare benchmark results with a baseline, on their fastest sample (min).
+
+    The median of a few samples follows whatever else the machine is doing, the fastest sample
+    is the closest to the cost of the code itself.
+
+    Parameters:
+        current, baseline (dict): Results of benchmark (or as read back from their JSON files).
+        threshold (float): Allowed slowdown of the fastest sample, 0.5 means 50% slower.
+
+    Returns:
+        list: (name, baseline min, current min, ratio) of every result slower than allowed.
+            Results missing from either side are not compared.
+    """
+    regressions = []
+    for name, now in current['results'].items():
+        base = baseline['results'].get(name)
+        if base is None:
+            continue
+        ratio = now['min'] / base['min']
+        if ratio > 1 + threshold:
+            regressions.append((name, base['min'], now['min'], ratio))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the maze solvers on fixed seeded mazes.')
+    parser.add_argument('--sizes', default=','.join(f'{r}x{c}' for r, c in SIZES),
+                        help='comma separated maze sizes, e.g. 10x10,100x100')
+    parser.add_argument('--loops', default=','.join(map(str, LOOP_PERCENTS)), help='comma separated loopPercent values')
+    parser.add_argument('--solvers', default=','.join(SOLVERS), help='comma separated solver names')
+    parser.add_argument('--repeats', type=int, default=7, help='samples per solver and maze')
+    parser.add_argument('--warmup', type=int, default=1, help='untimed runs before the samples')
+    parser.add_argument('--max-time', type=float, default=5.0, help='stop sampling a case after this many seconds')
+    parser.add_argument('--runs', type=int, default=1,
+                        help='runs of the whole suite, every case keeps the run with its median fastest sample')
+    parser.add_argument('--memory', action='store_true', help='also profile the memory of every case')
+    parser.add_argument('--out', help='write the results to this JSON file')
+    parser.add_argument('--check', action='store_true',
+                        help='fail (exit status 1) on a regression against the baseline')
+    parser.add_argument('--baseline', default=BASELINE, help='baseline JSON file of --check (default: the stored one)')
+    parser.add_argument('--save-baseline', action='store_true', help='store the results as the new baseline')
+    parser.add_argument('--threshold', type=float, default=0.5,
+                        help='allowed slowdown of the fastest sample against the baseline')
+    parser.add_argument('--retries', type=int, default=2,
+                        help='times a case slower than allowed is measured again before --check fails')
+    args = parser.parse_args(argv)
+
+    sizes = [tuple(int(n) for n in size.split('x')) for size in args.sizes.split(',')]
+    loops = [int(lp) for lp in args.loops.split(',')]
+    solvers = args.solvers.split(',')
+    unknown = [s for s in solvers if s not in SOLVERS]
+    if unknown:
+        parser.error(f'unknown solvers {", ".join(unknown)}, valid ones are {", ".join(SOLVERS)}')
+
+    runs = [benchmark(sizes, loops, solvers, warmup=args.warmup, repeats=args.repeats, maxTime=args.max_time,
+                      memory=args.memory) for _ in range(args.runs)]
+    current = runs[0]
+    for name in current['results']:
+        results = sorted((run['results'][name] for run in runs), key=lambda result: result['min'])
+        current['results'][name] = results[len(results) // 2]
+    for path in (args.out, BASELINE if args.save_baseline else None):
+        if path:
+            with open(path, 'w') as f:
+                json.dump(current, f, indent=2)
+    if args.save_baseline:
+        print(f'Stored the baseline in {BASELINE}.')
+    elif args.check:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        machine = {k: v for k, v in current['machine'].items() if k != 'date'}
+        reference = {k: v for k, v in baseline.get('machine', {}).items() if k != 'date'}
+        if machine != reference:
+            print(f'Note: {args.baseline} was taken on another machine or Python ({reference}), '
+                  f'the timings may not compare.')
+        regressions = compare(current, baseline, args.threshold)
+        for _ in range(args.retries):
+            if not regressions:
+                break
+            for name, *_ in regressions:
+                print(f'{name} is slower than allowed, measuring it again.')
+                solver, size, loopPercent = name.split('/')
+                again = benchmark([tuple(int(n) for n in size.split('x'))], [int(loopPercent)], [solver],
+                                  warmup=args.warmup, repeats=args.repeats, maxTime=args.max_time, log=None)
+                result = current['results'][name]
+                result['min'] = min(result['min'], again['results'][name]['min'])
+            regressions = compare(current, baseline, args.threshold)
+        for name, base, now, ratio in regressions:
+            print(f'REGRESSION {name}: {base * 1000:.3f} ms -> {now * 1000:.3f} ms ({ratio:.2f}x)')
+        if regressions:
+            return 1
+        print(f'No regression beyond {args.threshold:.0%} against {args.baseline}.')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
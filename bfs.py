@@ -1,14 +1,16 @@
 # Importing required modules
 from pyMaze import maze, agent, textLabel, COLOR  # Import maze generation and visualization
 from collections import deque  # For an efficient queue implementation
+from search import meetingPath  # Joins the two halves of the bidirectional search
 
-def BFS(m, start=None):
+def BFS(m, start=None, stats=None):
     """
     Perform Breadth-First Search (BFS) on the maze to find a path from the start cell to the goal cell.
 
     Parameters:
         m (maze): The maze object.
         start (tuple): Starting cell coordinates (row, col). Defaults to the bottom-right cell of the maze.
+        stats (searchStats): Optional instrument.searchStats to fill in with counters and timings.
 
     Returns:
         tuple:
@@ -19,44 +21,56 @@ def BFS(m, start=None):
     # Default start cell to bottom-right corner if not provided
     if start is None:
         start = (m.rows, m.cols)
+    trace = stats is not None
+    if trace:
+        stats._begin(m)
+
+    # Cells are flat indices into the CSR adjacency of the maze
+    offsets, targets = m.adjacency()
+    cols = m.cols
+    startIdx = (start[0] - 1) * cols + start[1] - 1
+    goalIdx = (m._goal[0] - 1) * cols + m._goal[1] - 1
 
     # Initialize BFS variables
-    frontier = deque([start])  # Queue to manage cells to explore
-    bfsPath = {start: start}  # Maps each cell to its parent
-    explored = [start]  # Tracks all visited cells
-    bSearch = [start]  # Sequence of cells explored during BFS
+    frontier = deque([startIdx])  # Queue to manage cells to explore
+    if trace:
+        stats._push(startIdx, 1)
+    parent = {startIdx: startIdx}  # Maps each cell to its parent
+    explored = bytearray(m.rows * cols)  # Tracks all visited cells
+    explored[startIdx] = 1
+    order = [startIdx]  # Sequence of cells explored during BFS
 
     while len(frontier) > 0:
         currCell = frontier.popleft()  # Dequeue the next cell to explore
+        if trace:
+            stats._expand(currCell)
 
         # If the goal cell is reached, stop searching
-        if currCell == m._goal:
+        if currCell == goalIdx:
             break
 
-        # Explore all possible directions from the current cell
-        for d in 'ESNW':  # Directions: East, South, North, West
-            if m.maze_map[currCell][d]:  # Check if movement in direction `d` is possible
-                # Determine the child cell based on direction
-                if d == 'E':
-                    childCell = (currCell[0], currCell[1] + 1)
-                elif d == 'W':
-                    childCell = (currCell[0], currCell[1] - 1)
-                elif d == 'S':
-                    childCell = (currCell[0] + 1, currCell[1])
-                elif d == 'N':
-                    childCell = (currCell[0] - 1, currCell[1])
-
-                # Skip cells that have already been visited
-                if childCell in explored:
-                    continue
+        # Explore the open neighbours of the current cell (East, South, North, West)
+        for childCell in targets[offsets[currCell]:offsets[currCell + 1]]:
+            # Skip cells that have already been visited
+            if explored[childCell]:
+                continue
+
+            # Add the child cell to the frontier and mark it explored
+            frontier.append(childCell)
+            explored[childCell] = 1
+            if trace:
+                stats._push(childCell, len(frontier))
 
-                # Add the child cell to the frontier and explored lists
-                frontier.append(childCell)
-                explored.append(childCell)
+            # Map the child cell to its parent
+            parent[childCell] = currCell
+            order.append(childCell)  # Record the exploration order
 
-                # Map the child cell to its parent in bfsPath
-                bfsPath[childCell] = currCell
-                bSearch.append(childCell)  # Record the exploration order
+    if trace:
+        stats._searched(len(order))  # Cells visited
+
+    # Back to (row, col) cells
+    bSearch = [(i // cols + 1, i % cols + 1) for i in order]
+    bfsPath = {(c // cols + 1, c % cols + 1): (p // cols + 1, p % cols + 1) for c, p in parent.items()}
 
     # Trace the forward path from the goal cell to the start cell
     fwdPath = {}
@@ -65,6 +79,86 @@ def BFS(m, start=None):
         fwdPath[bfsPath[cell]] = cell
         cell = bfsPath[cell]
 
+    if trace:
+        stats._done()
+    return bSearch, bfsPath, fwdPath
+
+def biBFS(m, start=None):
+    """
+    Perform a bidirectional Breadth-First Search, growing one frontier from the start cell and one
+    from the goal cell of the maze until they meet.
+
+    The smaller frontier is expanded one full layer at a time. Once a layer touches the other
+    search, the best meeting cell of that layer is taken, which keeps the path shortest while each
+    side only covers about half the search radius of BFS.
+
+    Parameters:
+        m (maze): The maze object.
+        start (tuple): Starting cell coordinates (row, col). Defaults to the bottom-right cell of the maze.
+
+    Returns:
+        tuple:
+            bSearch (list): Order of cells explored by both searches, interleaved.
+            bfsPath (dict): A dictionary mapping each visited cell to the cell it was reached from.
+                Cells on the shortest path map towards the start cell, so it can be walked from the goal like BFS.
+            fwdPath (dict): A dictionary mapping the shortest path from the start cell to the goal cell.
+    """
+    # Default start cell to bottom-right corner if not provided
+    if start is None:
+        start = (m.rows, m.cols)
+
+    # Cells are flat indices into the CSR adjacency of the maze
+    offsets, targets = m.adjacency()
+    cols = m.cols
+    startIdx = (start[0] - 1) * cols + start[1] - 1
+    goalIdx = (m._goal[0] - 1) * cols + m._goal[1] - 1
+
+    # One (frontier, parent, depth) per direction, the depth of a cell doubles as its explored mark
+    fParent, bParent = {startIdx: startIdx}, {goalIdx: goalIdx}
+    fDepth, bDepth = {startIdx: 0}, {goalIdx: 0}
+    fFrontier, bFrontier = [startIdx], [goalIdx]
+    order = [startIdx]  # Sequence of cells explored by both searches
+    meet = startIdx if startIdx == goalIdx else None
+    if meet is None:
+        order.append(goalIdx)
+
+    while meet is None and fFrontier and bFrontier:
+        # Expand the smaller frontier by one full layer
+        if len(fFrontier) <= len(bFrontier):
+            frontier, parent, depth, other = fFrontier, fParent, fDepth, bDepth
+        else:
+            frontier, parent, depth, other = bFrontier, bParent, bDepth, fDepth
+
+        best = None
+        nextLayer = []
+        for currCell in frontier:
+            d = depth[currCell] + 1
+            for childCell in targets[offsets[currCell]:offsets[currCell + 1]]:
+                # Skip cells this search has already visited
+                if childCell in depth:
+                    continue
+                depth[childCell] = d
+                parent[childCell] = currCell
+                nextLayer.append(childCell)
+                order.append(childCell)
+
+                # The other search reached this cell too, keep the shortest meeting
+                if childCell in other and (best is None or other[childCell] < other[best]):
+                    best = childCell
+        meet = best
+
+        if frontier is fFrontier:
+            fFrontier = nextLayer
+        else:
+            bFrontier = nextLayer
+
+    # Back to (row, col) cells
+    toCell = lambda i: (i // cols + 1, i % cols + 1)
+    bSearch = [toCell(i) for i in order]
+    if meet is None:  # The frontiers never met, the goal cannot be reached
+        return bSearch, {toCell(c): toCell(p) for c, p in fParent.items()}, {}
+
+    bfsPath, fwdPath = meetingPath(fParent, bParent, meet, startIdx, goalIdx, cols)
     return bSearch, bfsPath, fwdPath
 
 if __name__ == '__main__':
@@ -3,6 +3,7 @@ from bfs import BFS  # Importing Breadth-First Search algorithm
 from astar import aStar  # Importing A-Star algorithm
 from pyMaze import maze, agent, COLOR, textLabel  # Importing pyMaze for maze creation and visualization
 from timeit import timeit  # Importing timeit to measure execution time
+from instrument import memoryProfile  # Importing memoryProfile to measure memory use
 
 # Create a maze object with dimensions 50x70
 myMaze = maze(50, 70)
@@ -37,5 +38,9 @@ t2 = timeit(stmt='BFS(myMaze)', number=10, globals=globals())  # Time taken for
 textLabel(myMaze, 'A-Star Time', t1)  # Display execution time for A-Star
 textLabel(myMaze, 'BFS Time', t2)  # Display execution time for BFS
 
+# Measure and display the peak memory per maze cell of A-Star and BFS
+textLabel(myMaze, 'A-Star Peak Bytes/Cell', round(memoryProfile(aStar, myMaze)[1].peakPerCell, 1))
+textLabel(myMaze, 'BFS Peak Bytes/Cell', round(memoryProfile(BFS, myMaze)[1].peakPerCell, 1))
+
 # Run the maze visualization
 myMaze.run()
@@ -3,6 +3,7 @@ from bfs import BFS  # Importing Breadth-First Search algorithm
 from dfs import DFS  # Importing Depth-First Search algorithm
 from pyMaze import maze, agent, COLOR, textLabel  # Importing pyMaze for maze creation and visualization
 from timeit import timeit  # Importing timeit to measure execution time
+from instrument import memoryProfile  # Importing memoryProfile to measure memory use
 
 # Create a maze object with dimensions 20x30
 m = maze(20, 30)
@@ -37,5 +38,9 @@ t2 = timeit(stmt='BFS(m)', number=1000, globals=globals())  # Time taken for 100
 textLabel(m, 'DFS Time', t1)  # Display execution time for DFS
 textLabel(m, 'BFS Time', t2)  # Display execution time for BFS
 
+# Measure and display the peak memory per maze cell of DFS and BFS
+textLabel(m, 'DFS Peak Bytes/Cell', round(memoryProfile(DFS, m)[1].peakPerCell, 1))
+textLabel(m, 'BFS Peak Bytes/Cell', round(memoryProfile(BFS, m)[1].peakPerCell, 1))
+
 # Run the maze visualization
 m.run()
@@ -1,13 +1,14 @@
 # Importing necessary modules
 from pyMaze import maze, agent, textLabel, COLOR  # Importing pyMaze for maze generation, visualization, and agent representation
 
-def DFS(m, start=None):
+def DFS(m, start=None, stats=None):
     """
     Perform Depth First Search (DFS) on the maze to find a path from the start cell to the goal cell.
     
     Parameters:
         m (maze): The maze object.
         start (tuple): Starting cell coordinates (row, col). Defaults to the bottom-right cell of the maze.
+        stats (searchStats): Optional instrument.searchStats to fill in with counters and timings.
     
     Returns:
         tuple: 
@@ -18,43 +19,55 @@ def DFS(m, start=None):
     # If no start cell is provided, default to the bottom-right cell
     if start is None:
         start = (m.rows, m.cols)
+    trace = stats is not None
+    if trace:
+        stats._begin(m)
+
+    # Cells are flat indices into the CSR adjacency of the maze
+    offsets, targets = m.adjacency()
+    cols = m.cols
+    startIdx = (start[0] - 1) * cols + start[1] - 1
+    goalIdx = (m._goal[0] - 1) * cols + m._goal[1] - 1
 
     # Initialize the explored and frontier lists
-    explored = [start]  # Tracks all visited cells
-    frontier = [start]  # Tracks the current stack of cells for DFS
-    dfsPath = {}  # Maps each cell to its predecessor
-    dSearch = []  # Order of cells visited during the search
+    explored = bytearray(m.rows * cols)  # Tracks all visited cells
+    explored[startIdx] = 1
+    frontier = [startIdx]  # Tracks the current stack of cells for DFS
+    if trace:
+        stats._push(startIdx, 1)
+    parent = {}  # Maps each cell to its predecessor
+    order = []  # Order of cells visited during the search
 
     while len(frontier) > 0:
         currCell = frontier.pop()  # Remove and process the last cell in the stack
-        dSearch.append(currCell)  # Add the current cell to the search order
-        if currCell == m._goal:  # Check if the goal cell is reached
+        order.append(currCell)  # Add the current cell to the search order
+        if trace:
+            stats._expand(currCell)
+        if currCell == goalIdx:  # Check if the goal cell is reached
             break
 
-        # Explore all possible directions from the current cell
+        # Explore the open neighbours of the current cell (East, South, North, West)
         poss = 0  # Tracks the number of valid child cells
-        for d in 'ESNW':  # Directions: East, South, North, West
-            if m.maze_map[currCell][d] == True:  # Check if movement in direction `d` is possible
-                # Determine the child cell based on direction
-                if d == 'E':
-                    child = (currCell[0], currCell[1] + 1)
-                if d == 'W':
-                    child = (currCell[0], currCell[1] - 1)
-                if d == 'N':
-                    child = (currCell[0] - 1, currCell[1])
-                if d == 'S':
-                    child = (currCell[0] + 1, currCell[1])
-
-                if child in explored:  # Skip already visited cells
-                    continue
-
-                poss += 1  # Increment valid child count
-                explored.append(child)  # Mark the child as explored
-                frontier.append(child)  # Add the child to the stack
-                dfsPath[child] = currCell  # Record the path from parent to child
+        for child in targets[offsets[currCell]:offsets[currCell + 1]]:
+            if explored[child]:  # Skip already visited cells
+                continue
+
+            poss += 1  # Increment valid child count
+            explored[child] = 1  # Mark the child as explored
+            frontier.append(child)  # Add the child to the stack
+            if trace:
+                stats._push(child, len(frontier))
+            parent[child] = currCell  # Record the path from parent to child
 
         if poss > 1:  # Mark cells with multiple children for visualization
-            m.markCells.append(currCell)
+            m.markCells.append((currCell // cols + 1, currCell % cols + 1))
+
+    if trace:
+        stats._searched(len(parent) + 1)  # Cells visited, the start has no parent
+
+    # Back to (row, col) cells
+    dSearch = [(i // cols + 1, i % cols + 1) for i in order]
+    dfsPath = {(c // cols + 1, c % cols + 1): (p // cols + 1, p % cols + 1) for c, p in parent.items()}
 
     # Trace the forward path from the goal to the start cell
     fwdPath = {}  # Maps each cell in the forward path to its successor
@@ -63,6 +76,8 @@ def DFS(m, start=None):
         fwdPath[dfsPath[cell]] = cell
         cell = dfsPath[cell]
 
+    if trace:
+        stats._done()
     return dSearch, dfsPath, fwdPath
 
 if __name__ == '__main__':
@@ -0,0 +1,207 @@
+# D* Lite, incremental replanning for an agent on a maze whose walls change
+from heapq import heappush, heappop  # Binary heap for the open list
+from pyMaze import maze, agent, COLOR  # For maze generation and visualization
+
+INF = float('inf')
+
+class dStarLite:
+    """
+    D* Lite planner (Koenig and Likhachev) from a moving start cell to the goal of the maze.
+
+    The search runs backwards from the goal, g(cell) is the distance to the goal and rhs(cell) the
+    one step lookahead min(1 + g(neighbour)) over the open neighbours. The g/rhs values and the open
+    list are kept between calls, so after walls change (setWall / wallChanged) or the agent moves
+    (moveTo), plan() only repairs the cells whose distance to the goal really changed instead of
+    searching the whole maze again. The walls are read straight from the wall grid of the maze,
+    a change never makes the planner rebuild anything.
+
+    Parameters:
+        m (maze): The maze object.
+        start (tuple): Starting cell coordinates (row, col). Defaults to the bottom-right cell of the maze.
+    """
+    def __init__(self, m, start=None):
+        # Default start cell to bottom-right corner if not provided
+        if start is None:
+            start = (m.rows, m.cols)
+        self.m = m
+        cols = m.cols
+        n = m.rows * cols
+        self._start = (start[0] - 1) * cols + start[1] - 1
+        self._goal = (m._goal[0] - 1) * cols + m._goal[1] - 1
+        self._last = self._start  # Start cell the keys were last measured from
+        self._km = 0  # Key modifier, how far the start moved since the search began
+
+        self._g = [INF] * n
+        self._rhs = [INF] * n
+        self._rhs[self._goal] = 0
+        self._open = []  # Heap of (k1, k2, cell), an entry is stale when it differs from _key[cell]
+        self._key = {}  # Current key of every cell on the open list
+        self._push(self._goal)
+        self.searchPath = []  # Cells expanded by the last plan()
+
+    def _h(self, i):
+        # Manhattan distance from the start cell
+        cols = self.m.cols
+        s = self._start
+        return abs(i // cols - s // cols) + abs(i % cols - s % cols)
+
+    def _neighbours(self, i):
+        # Open neighbours of cell i, read from its wall bits
+        cols = self.m.cols
+        w = self.m._walls[i]
+        y = i % cols
+        if w & 1 and y + 1 < cols:
+            yield i + 1
+        if w & 8 and i + cols < len(self._g):
+            yield i + cols
+        if w & 4 and i >= cols:
+            yield i - cols
+        if w & 2 and y > 0:
+            yield i - 1
+
+    def _push(self, i):
+        k2 = min(self._g[i], self._rhs[i])
+        key = (k2 + self._h(i) + self._km, k2)
+        self._key[i] = key
+        heappush(self._open, (key[0], key[1], i))
+
+    def _updateRhs(self, i):
+        # rhs is one step more than the best open neighbour (0 for the goal)
+        if i != self._goal:
+            g = self._g
+            self._rhs[i] = min([g[j] for j in self._neighbours(i)], default=INF) + 1
+
+    def _updateVertex(self, i):
+        # A cell is on the open list exactly while it is inconsistent (g != rhs)
+        if self._g[i] != self._rhs[i]:
+            self._push(i)
+        else:
+            self._key.pop(i, None)
+
+    def _computeShortestPath(self):
+        g, rhs, open, key = self._g, self._rhs, self._open, self._key
+        s = self._start
+        expanded = []
+        while open:
+            k1, k2, u = open[0]
+            if key.get(u) != (k1, k2):  # Stale entry
+                heappop(open)
+                continue
+            # Stop once the start is consistent and no key is smaller than its own
+            sk = min(g[s], rhs[s])
+            if (k1, k2) >= (sk + self._km, sk) and rhs[s] == g[s]:
+                break
+            heappop(open)
+            del key[u]
+            kNew = min(g[u], rhs[u])
+            if (k1, k2) < (kNew + self._h(u) + self._km, kNew):
+                self._push(u)  # Key grew since it was pushed (the start moved)
+                continue
+            expanded.append(u)
+            if g[u] > rhs[u]:
+                # Overconsistent, the distance of u went down
+                g[u] = rhs[u]
+                for j in self._neighbours(u):
+                    if j != self._goal and g[u] + 1 < rhs[j]:
+                        rhs[j] = g[u] + 1
+                        self._updateVertex(j)
+            else:
+                # Underconsistent, the distance of u went up, redo u and whoever relied on it
+                gOld = g[u]
+                g[u] = INF
+                for j in list(self._neighbours(u)) + [u]:
+                    if rhs[j] == gOld + 1 or j == u:
+                        self._updateRhs(j)
+                    self._updateVertex(j)
+        return expanded
+
+    def wallChanged(self, cell, d):
+        """
+        Tell the planner that the wall on side d of cell changed (already applied to the maze).
+
+        Parameters:
+            cell (tuple): Cell coordinates (row, col).
+            d (str): Side of the cell, 'E', 'W', 'N' or 'S'.
+        """
+        x, y = cell
+        cols = self.m.cols
+        i = (x - 1) * cols + y - 1
+        j = {'E': i + 1, 'W': i - 1, 'N': i - cols, 'S': i + cols}[d]
+        if not (0 <= j < len(self._g)) or (d in 'EW' and j // cols != i // cols):
+            return  # Outer wall, no cell behind it
+
+        for u in (i, j):
+            self._updateRhs(u)
+            self._updateVertex(u)
+
+    def setWall(self, cell, d, isOpen=True):
+        """
+        Open or close a wall of the maze (maze.setWall) and tell the planner about it.
+
+        Parameters:
+            cell (tuple): Cell coordinates (row, col).
+            d (str): Side of the cell, 'E', 'W', 'N' or 'S'.
+            isOpen (bool): True to open the wall, False to close it.
+
+        Raises ValueError like maze.setWall, before the maze or the planner change.
+        """
+        self.m.setWall(*cell, d, isOpen)
+        self.wallChanged(cell, d)
+
+    def moveTo(self, cell):
+        """
+        Move the start of the planner, e.g. after the agent took a step.
+
+        Parameters:
+            cell (tuple): New start cell coordinates (row, col).
+        """
+        self._start = (cell[0] - 1) * self.m.cols + cell[1] - 1
+        # The keys on the open list were computed from the old start, km keeps them lower bounds
+        self._km += self._h(self._last)
+        self._last = self._start
+
+    def plan(self):
+        """
+        Repair the search after the latest changes and return the shortest path from the start to the goal.
+
+        Returns:
+            dict: A dictionary mapping the shortest path from the start cell to the goal cell,
+                  empty if the goal cannot be reached. The cells expanded are left in searchPath.
+        """
+        cols = self.m.cols
+        toCell = lambda i: (i // cols + 1, i % cols + 1)
+        self.searchPath = [toCell(i) for i in self._computeShortestPath()]
+
+        # Walk downhill on g from the start
+        g = self._g
+        fwdPath = {}
+        cell = self._start
+        if g[cell] == INF:
+            return fwdPath
+        while cell != self._goal:
+            nxt = min(self._neighbours(cell), key=g.__getitem__)
+            fwdPath[toCell(cell)] = toCell(nxt)
+            cell = nxt
+        return fwdPath
+
+if __name__ == '__main__':
+    """
+    Main block to plan on a generated maze, close a wall on the way and plan again.
+    """
+    m = maze(20, 20)
+    m.CreateMaze(loopPercent=40)
+
+    planner = dStarLite(m, (20, 20))
+    fwdPath = planner.plan()
+    print('Initial plan:', len(fwdPath), 'steps,', len(planner.searchPath), 'cells expanded')
+
+    # Close the wall the path leaves the start through and replan
+    cell, nxt = next(iter(fwdPath.items()))
+    d = {(0, 1): 'E', (0, -1): 'W', (1, 0): 'S', (-1, 0): 'N'}[(nxt[0] - cell[0], nxt[1] - cell[1])]
+    planner.setWall(cell, d, isOpen=False)
+    fwdPath = planner.plan()
+    print('Replanned:', len(fwdPath), 'steps,', len(planner.searchPath), 'cells expanded')
+
+    a = agent(m, 20, 20, footprints=True, color=COLOR.red)
+    m.tracePath({a: fwdPath})
+    m.run()
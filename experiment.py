@@ -0,0 +1,187 @@
+# Running a grid of maze and algorithm parameters over many seeded trials, on all the processors
+import os  # For the default number of workers
+import csv  # Streaming the trial rows to a CSV file
+import json  # ... or to a JSON lines file
+import math  # Square root for the confidence intervals
+from itertools import product  # The parameter grid
+from time import perf_counter  # Wall time of every solver run
+from multiprocessing import Pool  # Processes, the solvers are CPU bound pure Python
+from pyMaze import maze
+from astar import aStar, bucketAStar, biAStar, corridorAStar
+from astar2 import aStar2
+from astar3 import aStar as aStar3
+from bfs import BFS, biBFS
+from dfs import DFS
+
+# Algorithms selectable by name, astar3 also takes the p of its Minkowski heuristic
+ALGORITHMS = {
+    'astar': aStar,
+    'astar2': aStar2,
+    'astar3': aStar3,
+    'bucket': bucketAStar,
+    'biastar': biAStar,
+    'corridor': corridorAStar,
+    'bfs': BFS,
+    'bibfs': biBFS,
+    'dfs': DFS,
+}
+
+# Columns of every trial row, one row per trial and algorithm
+FIELDS = ['rows', 'cols', 'loopPercent', 'pattern', 'generator', 'trial', 'seed',
+          'algorithm', 'pathLength', 'expansions', 'seconds']
+METRICS = ['pathLength', 'expansions', 'seconds']
+
+def _trial(task):
+    """
+    Generate the maze of one trial and run every algorithm on it, from the bottom-right cell to (1, 1).
+
+    Returns:
+        list: One row (dict of FIELDS) per algorithm.
+    """
+    (rows, cols, loopPercent, pattern, generator), trial, seed, algorithms = task
+    m = maze(rows, cols, headless=True)
+    m.CreateMaze(1, 1, pattern=pattern, loopPercent=loopPercent, algorithm=generator, seed=seed)
+    m.adjacency()  # Built before the timing, or the first algorithm would pay for it
+    results = []
+    for label, name, kw in algorithms:
+        t = perf_counter()
+        searchPath, parentMap, fwdPath = ALGORITHMS[name](m, **kw)
+        t = perf_counter() - t
+        results.append({'rows': rows, 'cols': cols, 'loopPercent': loopPercent, 'pattern': pattern,
+                        'generator': generator, 'trial': trial, 'seed': seed, 'algorithm': label,
+                        'pathLength': len(fwdPath) + 1, 'expansions': len(searchPath), 'seconds': t})
+    return results
+
+def _percentile(values, q):
+    # Linear interpolation between the closest ranks of the sorted values
+    k = (len(values) - 1) * q / 100
+    lo = math.floor(k)
+    hi = min(lo + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (k - lo)
+
+def summarize(rows):
+    """
+    Summary statistics of trial rows, per maze configuration and algorithm.
+
+    Parameters:
+        rows (iterable): Trial rows as produced by runExperiment (or read back from its CSV / JSON lines).
+
+    Returns:
+        list: One dict per group with its configuration, the number of trials n and, for every metric of
+            METRICS, its mean, standard deviation, 95% confidence interval of the mean (normal
+            approximation) and the 5th, 50th, 95th and 99th percentiles, e.g. 'expansions_mean'.
+    """
+    groups = {}
+    for row in rows:
+        key = tuple(row[f] for f in ('rows', 'cols', 'loopPercent', 'pattern', 'generator', 'algorithm'))
+        values = groups.setdefault(key, {metric: [] for metric in METRICS})
+        for metric in METRICS:
+            values[metric].append(float(row[metric]))
+
+    summary = []
+    for key, values in groups.items():
+        group = dict(zip(('rows', 'cols', 'loopPercent', 'pattern', 'generator', 'algorithm'), key))
+        for metric, v in values.items():
+            n = len(v)
+            mean = sum(v) / n
+            std = math.sqrt(sum((x - mean) ** 2 for x in v) / (n - 1)) if n > 1 else 0.0
+            half = 1.96 * std / math.sqrt(n)
+            v.sort()
+            group['n'] = n
+            group.update({f'{metric}_mean': mean, f'{metric}_std': std,
+                          f'{metric}_ci95': (mean - half, mean + half),
+                          **{f'{metric}_p{q}': _percentile(v, q) for q in (5, 50, 95, 99)}})
+        summary.append(group)
+    return summary
+
+def runExperiment(sizes=((20, 30),), loopPercents=(100,), patterns=(None,), generators=('backtracker',),
+                  algorithms=('astar', 'astar2'), ps=(1, 2), trials=100, seed=0, workers=None,
+                  chunkSize=None, out=None):
+    """
+    Run every combination of the parameter grid for a number of seeded trials over a pool of processes.
+
+    Every trial generates one maze (seeded with seed + trial, so a trial can be generated again with
+    CreateMaze(seed=...)) and runs all the algorithms on that same maze, from the bottom-right cell to (1, 1).
+
+    Parameters:
+        sizes (iterable): (rows, cols) of the mazes.
+        loopPercents (iterable): loopPercent values of CreateMaze.
+        patterns (iterable): pattern values of CreateMaze (None, 'h' or 'v').
+        generators (iterable): algorithm values of CreateMaze ('backtracker', 'kruskal', ...).
+        algorithms (iterable): Names of ALGORITHMS. 'astar3' is run once for every p of ps.
+        ps (iterable): p values of the Minkowski heuristic of astar3.
+        trials (int): Number of trials (mazes) per maze configuration.
+        seed (int): Seed of the first trial.
+        workers (int): Number of worker processes. Defaults to os.cpu_count(), 1 runs in this process.
+        chunkSize (int): Trials sent to a worker at a time. Defaults to about four chunks per worker.
+        out (str): File the trial rows are streamed to while the experiment runs, as CSV or, for a
+            name ending with .jsonl, as JSON lines.
+
+    Returns:
+        list: The summary of all trial rows (see summarize).
+    """
+    labels = []
+    for name in algorithms:
+        if name not in ALGORITHMS:
+            raise ValueError(f'Unknown algorithm {name!r}, valid ones are {", ".join(ALGORITHMS)}')
+        if name == 'astar3':
+            labels.extend((f'astar3(p={p})', name, {'p': p}) for p in ps)
+        else:
+            labels.append((name, name, {}))
+    configs = [(r, c, lp, pattern, gen) for (r, c), lp, pattern, gen in product(sizes, loopPercents, patterns, generators)]
+    tasks = [(config, t, seed + t, labels) for config in configs for t in range(trials)]
+    workers = workers or os.cpu_count() or 1
+    if chunkSize is None:
+        chunkSize = max(1, len(tasks) // (workers * 4))
+
+    f = open(out, 'w', newline='') if out else None
+    write = None
+    if f and out.endswith('.jsonl'):
+        write = lambda row: f.write(json.dumps(row) + '\n')
+    elif f:
+        writer = csv.DictWriter(f, FIELDS)
+        writer.writeheader()
+        write = writer.writerow
+
+    def stream(results):
+        # Every row is written out as soon as its trial is done, only the metrics are kept for the summary
+        for trialRows in results:
+            for row in trialRows:
+                if write:
+                    write(row)
+                yield row
+
+    pool = None
+    try:
+        if workers == 1:
+            results = map(_trial, tasks)
+        else:
+            pool = Pool(workers)
+            results = pool.imap_unordered(_trial, tasks, chunkSize)
+        return summarize(stream(results))
+    finally:
+        if pool is not None:
+            pool.terminate()
+        if f:
+            f.close()
+
+def printSummary(summary):
+    """
+    Print a summary (see summarize) as a table, one line per group and metric.
+    """
+    print(f'{"maze":<24}{"algorithm":<14}{"metric":<12}{"n":>7}{"mean":>12}{"95% CI":>26}{"p50":>12}{"p95":>12}')
+    for g in summary:
+        config = f'{g["rows"]}x{g["cols"]} loop={g["loopPercent"]} {g["pattern"] or ""}'.strip()
+        for metric in METRICS:
+            lo, hi = g[f'{metric}_ci95']
+            print(f'{config:<24}{g["algorithm"]:<14}{metric:<12}{g["n"]:>7}{g[f"{metric}_mean"]:>12.4g}'
+                  f'{f"[{lo:.4g}, {hi:.4g}]":>26}{g[f"{metric}_p50"]:>12.4g}{g[f"{metric}_p95"]:>12.4g}')
+
+if __name__ == '__main__':
+    """
+    Main block to compare the A* heuristics like astarVSastar2.py, over two maze sizes and loop percentages.
+    """
+    summary = runExperiment(sizes=[(20, 30), (50, 70)], loopPercents=[30, 100],
+                            algorithms=['astar', 'astar2', 'astar3', 'bfs'], ps=[1, 3],
+                            trials=100, out='experiment.csv')
+    printSummary(summary)
@@ -0,0 +1,213 @@
+# Counters and an event hook the solvers can fill in while they search, and a memory profile of any solver call
+import re  # Names of the structures in the allocating source lines
+import copy  # Copy of the maze for the second run of memoryProfile
+import sys  # Profile hook to find the moment of the memory snapshot
+import linecache  # Source lines of the allocations
+import tracemalloc  # Memory tracing
+from collections import namedtuple  # The memory report
+from time import perf_counter  # Phase timings
+
+class searchStats:
+    """
+    Statistics of one solver run, pass it as the stats argument of aStar, BFS or DFS.
+
+    The solver resets the counters when it starts, so one object can be reused for many runs.
+    Without a stats object the solvers skip all of this, the only cost left is one test of a
+    local flag per step.
+
+    Parameters:
+        hook (callable): Optional hook(event, cell) called for every event of the search, with cell
+            as (row, col). The events are 'push' (the cell joins the frontier), 'expand' (the cell
+            leaves the frontier and is expanded) and 'stale' (an outdated frontier entry is dropped).
+
+    Attributes:
+        expanded (int): Cells expanded.
+        reexpanded (int): Cells expanded more than once (0 for the solvers with a closed set).
+        pushes (int): Entries pushed on the frontier (heap, queue or stack).
+        pops (int): Entries popped from the frontier, expanded or stale.
+        stalePops (int): Popped entries skipped because their cell was already expanded.
+        peakFrontier (int): Largest size of the frontier.
+        peakClosed (int): Largest size of the closed (or visited) set.
+        heuristicCalls (int): Evaluations of the heuristic.
+        searchTime (float): Seconds spent searching.
+        pathTime (float): Seconds spent building the returned paths.
+    """
+    FIELDS = ('expanded', 'reexpanded', 'pushes', 'pops', 'stalePops', 'peakFrontier', 'peakClosed',
+              'heuristicCalls', 'searchTime', 'pathTime')
+
+    def __init__(self, hook=None):
+        self.hook = hook
+        self._begin(None)
+
+    def _begin(self, m):
+        # Called by the solver before it searches
+        for name in self.FIELDS:
+            setattr(self, name, 0)
+        self._cols = m.cols if m is not None else 1
+        self._t = perf_counter()
+
+    def _push(self, cell, frontier):
+        # cell is a flat index, frontier the size of the frontier after the push
+        self.pushes += 1
+        if frontier > self.peakFrontier:
+            self.peakFrontier = frontier
+        if self.hook:
+            self.hook('push', (cell // self._cols + 1, cell % self._cols + 1))
+
+    def _expand(self, cell):
+        self.pops += 1
+        self.expanded += 1
+        if self.hook:
+            self.hook('expand', (cell // self._cols + 1, cell % self._cols + 1))
+
+    def _stale(self, cell):
+        self.pops += 1
+        self.stalePops += 1
+        if self.hook:
+            self.hook('stale', (cell // self._cols + 1, cell % self._cols + 1))
+
+    def _searched(self, closed):
+        # Called when the search loop is over, closed being the final (so largest) closed set size
+        self.peakClosed = closed
+        t = perf_counter()
+        self.searchTime = t - self._t
+        self._t = t
+
+    def _done(self):
+        # Called when the returned paths are built
+        self.pathTime = perf_counter() - self._t
+
+    def asdict(self):
+        """
+        The counters and timings as a dict, e.g. to write them out as JSON.
+        """
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+    def __repr__(self):
+        return 'searchStats(' + ', '.join(f'{k}={v!r}' for k, v in self.asdict().items()) + ')'
+
+# Result of memoryProfile, the by* dicts map an allocation site (filename, lineno) to its bytes, largest first
+memoryReport = namedtuple('memoryReport', ['peak', 'retained', 'cells', 'peakPerCell', 'retainedPerCell',
+                                           'peakBy', 'retainedBy'])
+
+# Structure an allocating line works on: heappush(x, ...), x.append(...), x[...] = ..., x = ...
+_TARGET = re.compile(r'\s*(?:heappush\(\s*(\w+)|([\w.]+?)\s*\.\s*(?:append|appendleft|extend|add|insert)\('
+                     r'|(\w+)\s*(?:\[.*\])?\s*=(?!=))')
+# Slices of the CSR adjacency, the neighbours of a cell and the int cells they hold
+_ADJACENCY = re.compile(r'\btargets\[offsets\[')
+# Allocations of the profiling itself, left out of the breakdowns
+_IGNORE = [tracemalloc.Filter(False, f) for f in (tracemalloc.__file__, linecache.__file__, __file__, '<unknown>')]
+
+def structureOf(site):
+    """
+    Best effort name of the structure an allocation site (filename, lineno) works on, read from its
+    source line: heappush(x, ...), x.append(...), x[...] = ... and x = ... give x, a slice of the
+    adjacency gives 'adjacency slice' and any other line 'other'. A statement over several lines
+    is only seen through the line tracemalloc names, which may not be the one with the structure.
+    """
+    line = linecache.getline(*site).strip()
+    if _ADJACENCY.search(line):
+        return 'adjacency slice'
+    match = _TARGET.match(line)
+    if match:
+        return next(g for g in match.groups() if g)
+    return 'other'
+
+def _breakdown(snapshot, before):
+    # Bytes per allocation site (filename, lineno) allocated between two snapshots
+    by = {}
+    for stat in snapshot.filter_traces(_IGNORE).compare_to(before.filter_traces(_IGNORE), 'lineno'):
+        if stat.size_diff > 0:
+            frame = stat.traceback[0]
+            by[(frame.filename, frame.lineno)] = stat.size_diff
+    return dict(sorted(by.items(), key=lambda kv: -kv[1]))
+
+def byStructure(breakdown, label=structureOf):
+    """
+    Group a breakdown of memoryProfile (peakBy or retainedBy) by label(site), largest first.
+
+    Parameters:
+        breakdown (dict): Bytes per allocation site (filename, lineno).
+        label (callable): Name of the structure of a site. Defaults to structureOf, a best effort
+            reading of the source line, pass a dict.get or a function of its own for exact names.
+    """
+    by = {}
+    for site, size in breakdown.items():
+        name = label(site)
+        by[name] = by.get(name, 0) + size
+    return dict(sorted(by.items(), key=lambda kv: -kv[1]))
+
+def memoryProfile(solver, m, *args, **kwargs):
+    """
+    Run solver(m, *args, **kwargs) under tracemalloc and measure the memory it uses.
+
+    peak is the most memory held at once during the call and retained what is still held by its
+    result afterwards, both in bytes above what was allocated before the call. The adjacency of
+    the maze is built before, it belongs to the maze rather than to the solver.
+
+    peakBy and retainedBy break the bytes down by allocation site, the (filename, lineno) of the
+    source line that allocated them. byStructure groups them by structure, by default with a best
+    effort reading of those source lines (see structureOf). peakBy is taken from a snapshot at the
+    moment a Python function returned with the most memory allocated. That is the same moment as
+    the peak or close to it (the solvers only give memory back at the end), but it is only known
+    once the solver is done, so the solver runs a second time to take the snapshot.
+    That run is on a headless copy of the maze with its own markCells, so the side effects of the
+    solver (DFS marking cells) happen once on m, and its result is thrown away.
+
+    Returns:
+        tuple: The result of the solver and its memoryReport, with the bytes per cell of the maze
+            in peakPerCell and retainedPerCell.
+    """
+    m.adjacency()
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    profile = sys.getprofile()
+    try:
+        # First run, the peak, the retained bytes and which function return held the most memory
+        before = tracemalloc.take_snapshot()
+        base = tracemalloc.get_traced_memory()[0]
+        returns = [0, 0, -1]  # Returns seen, most memory at a return, the return it was at
+
+        def count(frame, event, arg):
+            if event == 'return':
+                current = tracemalloc.get_traced_memory()[0]
+                if current > returns[1]:
+                    returns[1], returns[2] = current, returns[0]
+                returns[0] += 1
+
+        tracemalloc.reset_peak()
+        sys.setprofile(count)
+        try:
+            result = solver(m, *args, **kwargs)
+        finally:
+            sys.setprofile(profile)
+        current, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+
+        # Second run, snapshot at that same return
+        snapshot = []
+        seen = [0]
+
+        def snap(frame, event, arg):
+            if event == 'return':
+                if seen[0] == returns[2]:
+                    snapshot.append(tracemalloc.take_snapshot())
+                seen[0] += 1
+
+        clone = copy.copy(m)
+        clone.markCells = []
+        sys.setprofile(snap)
+        try:
+            solver(clone, *args, **kwargs)
+        finally:
+            sys.setprofile(profile)
+        retainedBy = _breakdown(after, before)
+        peakBy = _breakdown(snapshot[0], after) if snapshot else {}
+    finally:
+        if not tracing:
+            tracemalloc.stop()
+
+    cells = m.rows * m.cols
+    peak, retained = peak - base, current - base
+    return result, memoryReport(peak, retained, cells, peak / cells, retained / cells, peakBy, retainedBy)
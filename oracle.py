@@ -0,0 +1,166 @@
+# Exact distances and paths between any two cells of a perfect maze, without any search
+from array import array  # Compact int arrays for the tree and the Euler tour
+from pyMaze import maze  # For the example below
+
+class distanceOracle:
+    """
+    Distance oracle for a perfect maze (loopPercent=0), where the open cells form a spanning tree.
+
+    The tree is rooted at the goal of the maze once and walked into an Euler tour. The lowest
+    common ancestor (LCA) of two cells is the shallowest cell of the tour between their first
+    visits. Those range minimums come from a sparse table over blocks of the tour, plus a min()
+    over the two partial blocks at the ends. That keeps the table small (O(n) in total) even for
+    millions of cells while every query stays O(log n).
+
+    Parameters:
+        m (maze): The maze object. Raises ValueError if its open cells do not form a spanning tree.
+    """
+    _BLOCK = 32  # Tour entries per block of the sparse table
+
+    def __init__(self, m):
+        cols = m.cols
+        n = m.rows * cols
+        offsets, targets = m.adjacency()
+        goal = (m._goal[0] - 1) * cols + m._goal[1] - 1
+
+        # A spanning tree has exactly n-1 passages and reaches every cell from the goal
+        parent = m._parent if m._parent is not None else m._bfsTree(goal)
+        if len(targets) != 2 * (n - 1) or parent.count(-1) != 1:
+            raise ValueError('The maze is not a perfect maze (its cells do not form a spanning tree)!')
+        root = parent.index(-1)
+
+        # Children of every cell as CSR (counting sort on the parent)
+        start = array('i', [0]) * (n + 1)
+        for p in parent:
+            start[p + 1] += 1
+        start[0] = 0
+        for i in range(n):
+            start[i + 1] += start[i]
+        children = array('i', [0]) * n
+        fill = start[:-1]
+        for c, p in enumerate(parent):
+            if p >= 0:
+                children[fill[p]] = c
+                fill[p] += 1
+
+        # Iterative Euler tour, a cell is written when entered and again after each of its children.
+        # Tour entries are depth * n + cell, so the smallest entry of a range is its shallowest cell.
+        depth = array('i', [0]) * n
+        first = array('i', [0]) * n
+        tour = array('q')
+        nextChild = start[:-1]
+        stack = [root]
+        first[root] = 0
+        while stack:
+            v = stack[-1]
+            tour.append(depth[v] * n + v)
+            k = nextChild[v]
+            if k < start[v + 1]:
+                nextChild[v] = k + 1
+                c = children[k]
+                depth[c] = depth[v] + 1
+                first[c] = len(tour)
+                stack.append(c)
+            else:
+                stack.pop()
+
+        # Sparse table over the block minimums, level j holds the minimum of 2**j blocks
+        b = self._BLOCK
+        level = array('q', [min(tour[i:i + b]) for i in range(0, len(tour), b)])
+        table = [level]
+        span = 1
+        while 2 * span <= len(table[0]):
+            level = array('q', map(min, level[:-span], level[span:]))
+            table.append(level)
+            span *= 2
+
+        self.rows, self.cols, self._n = m.rows, cols, n
+        self._parent, self._depth, self._first, self._tour, self._table = parent, depth, first, tour, table
+
+    def _lca(self, a, b):
+        # Lowest common ancestor of the flat cells a and b, as a tour entry
+        l, r = self._first[a], self._first[b]
+        if l > r:
+            l, r = r, l
+        r += 1
+        tour, size = self._tour, self._BLOCK
+        lb, rb = -(-l // size), r // size  # Whole blocks inside [l, r)
+        if lb >= rb:
+            return min(tour[l:r])
+        best = min(tour[l:lb * size]) if l < lb * size else tour[l]
+        if rb * size < r:
+            best = min(best, min(tour[rb * size:r]))
+        j = (rb - lb).bit_length() - 1
+        level = self._table[j]
+        return min(best, level[lb], level[rb - (1 << j)])
+
+    def _index(self, cell):
+        x, y = cell
+        if not (1 <= x <= self.rows and 1 <= y <= self.cols):
+            raise ValueError(f'{cell} is not a cell of the maze!')
+        return (x - 1) * self.cols + y - 1
+
+    def lca(self, a, b):
+        """
+        Lowest common ancestor of two cells, the cell where the paths from a and b towards the goal join.
+
+        Parameters:
+            a, b (tuple): Cell coordinates (row, col).
+
+        Returns:
+            tuple: Coordinates (row, col) of the common ancestor.
+        """
+        v = self._lca(self._index(a), self._index(b)) % self._n
+        return (v // self.cols + 1, v % self.cols + 1)
+
+    def distance(self, a, b):
+        """
+        Length of the path between two cells, in steps.
+
+        Parameters:
+            a, b (tuple): Cell coordinates (row, col).
+
+        Returns:
+            int: Number of steps from a to b.
+        """
+        i, j = self._index(a), self._index(b)
+        return self._depth[i] + self._depth[j] - 2 * (self._lca(i, j) // self._n)
+
+    def path(self, a, b):
+        """
+        The path between two cells, walked up the tree from both ends to their common ancestor.
+
+        Parameters:
+            a, b (tuple): Cell coordinates (row, col).
+
+        Returns:
+            dict: A dictionary mapping the path from cell a to cell b, like the fwdPath of the solvers.
+        """
+        i, j = self._index(a), self._index(b)
+        top = self._lca(i, j) % self._n
+        parent, cols = self._parent, self.cols
+
+        # Up from a to the ancestor, then from the ancestor down to b
+        cells = [i]
+        while cells[-1] != top:
+            cells.append(parent[cells[-1]])
+        down = []
+        while j != top:
+            down.append(j)
+            j = parent[j]
+        cells.extend(reversed(down))
+
+        toCell = lambda k: (k // cols + 1, k % cols + 1)
+        return {toCell(p): toCell(c) for p, c in zip(cells, cells[1:])}
+
+if __name__ == '__main__':
+    """
+    Main block to answer a few distance queries on a generated perfect maze.
+    """
+    m = maze(50, 70, headless=True)
+    m.CreateMaze(loopPercent=0, seed=1)
+
+    oracle = distanceOracle(m)
+    print('Start to goal:', oracle.distance((50, 70), m._goal))
+    print('Corner to corner:', oracle.distance((1, 70), (50, 1)))
+    print('Path length:', len(oracle.path((1, 70), (50, 1))))
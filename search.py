@@ -0,0 +1,463 @@
+# Shared best-first search engine used by the A* variants
+from heapq import heappush, heappop  # Lock-free binary heap for the open list
+
+def _setup(m, start, h, stats):
+    """
+    Start of a search of bestFirstSearch or bucketSearch, the engines only differ in their open list.
+
+    Returns:
+        tuple: The start cell (bottom-right cell of the maze if None), the CSR adjacency
+            (offsets, targets), the flat start and goal cells and the heuristic of the start.
+    """
+    # Default start cell to bottom-right corner if not provided
+    if start is None:
+        start = (m.rows, m.cols)
+    goal = m._goal
+    if stats is not None:
+        stats._begin(m)
+
+    # Cells are flat indices into the CSR adjacency of the maze
+    offsets, targets = m.adjacency()
+    cols = m.cols
+    startIdx = (start[0] - 1) * cols + start[1] - 1
+    goalIdx = (goal[0] - 1) * cols + goal[1] - 1
+
+    hStart = h(start, goal) if h else 0
+    if stats is not None:
+        stats._push(startIdx, 1)
+    return start, offsets, targets, startIdx, goalIdx, hStart
+
+def _result(m, start, expanded, parent, h, stats):
+    """
+    End of a search of bestFirstSearch or bucketSearch, from the flat expanded cells and parents.
+
+    Returns:
+        tuple: searchPath, aPath and fwdPath in (row, col) cells.
+    """
+    if stats is not None:
+        stats._searched(len(expanded))
+        stats.heuristicCalls = stats.pushes if h else 0  # One evaluation per push
+
+    # Back to (row, col) cells
+    cols = m.cols
+    searchPath = [(i // cols + 1, i % cols + 1) for i in expanded]
+    aPath = {(c // cols + 1, c % cols + 1): (p // cols + 1, p % cols + 1) for c, p in parent.items()}
+
+    # Reconstruct the shortest path from goal to start
+    fwdPath = {}
+    cell = m._goal
+    while cell != start:
+        fwdPath[aPath[cell]] = cell
+        cell = aPath[cell]
+
+    if stats is not None:
+        stats._done()
+    return searchPath, aPath, fwdPath
+
+def bestFirstSearch(m, start=None, h=None, stats=None):
+    """
+    Best-first (A*) search on the maze from start to the goal of the maze.
+
+    The open list is a plain heapq heap of (f_score, heuristic, cell) entries.
+    A cell can be pushed more than once when a shorter path to it is found;
+    the closed set makes sure each cell is expanded only once and the
+    outdated (stale) heap entries are skipped when popped.
+
+    Parameters:
+        m (maze): The maze object.
+        start (tuple): Starting cell coordinates (row, col). Defaults to the bottom-right cell of the maze.
+        h (callable): Heuristic h(cell, goal). Defaults to 0 (Dijkstra).
+        stats (searchStats): Optional instrument.searchStats to fill in.
+
+    Returns:
+        tuple:
+            searchPath (list): Sequence of cells expanded during the search.
+            aPath (dict): A dictionary mapping each reached cell to its predecessor.
+            fwdPath (dict): A dictionary mapping the shortest path from the start cell to the goal cell.
+    """
+    start, offsets, targets, startIdx, goalIdx, hStart = _setup(m, start, h, stats)
+    goal, cols, trace = m._goal, m.cols, stats is not None
+
+    open = [(hStart, hStart, startIdx)]  # (f_score, heuristic, cell)
+
+    parent = {}  # Cell -> predecessor
+    g_score = {startIdx: 0}  # Cost from start to the cell
+    closed = bytearray(m.rows * cols)  # Cells already expanded
+    expanded = []
+
+    while open:
+        curr = heappop(open)[2]
+        if closed[curr]:  # Stale entry, the cell was expanded with a better f_score
+            if trace:
+                stats._stale(curr)
+            continue
+        closed[curr] = 1
+        expanded.append(curr)
+        if trace:
+            stats._expand(curr)
+
+        if curr == goalIdx:
+            break
+
+        temp_g_score = g_score[curr] + 1
+        for child in targets[offsets[curr]:offsets[curr + 1]]:  # Open neighbours, E,S,N,W
+            if closed[child]:
+                continue
+            # Update only if a better path is found, the heuristic is computed once per push
+            if temp_g_score < g_score.get(child, float('inf')):
+                parent[child] = curr
+                g_score[child] = temp_g_score
+                hChild = h((child // cols + 1, child % cols + 1), goal) if h else 0
+                heappush(open, (temp_g_score + hChild, hChild, child))
+                if trace:
+                    stats._push(child, len(open))
+
+    return _result(m, start, expanded, parent, h, stats)
+
+def bucketSearch(m, start=None, h=None, stats=None):
+    """
+    A* search with a bucket queue (Dial's algorithm) instead of a heap, for an integer heuristic.
+
+    Every step costs 1, so with a consistent integer heuristic a push lands at most 2 above the
+    f_score being expanded. The open list is then just 3 levels used round robin (f % 3), each
+    a list of stacks indexed by the heuristic of their cells. Popping takes the smallest
+    heuristic of the current f_score, which is the largest g_score as in bestFirstSearch, so
+    both push and pop are O(1) instead of O(log n).
+
+    That only pays off on large mazes with loops. In benchmark_baseline.json bucketAStar runs at
+    1.23x to 1.39x the speed of aStar (fastest samples) at 300x300 and 1000x1000 with loopPercent
+    30 and 100, but at 0.78x to 0.81x on the perfect mazes (loopPercent 0) of those sizes, and
+    up to 100x100 it is at best level with aStar (0.77x to 1.06x).
+
+    Parameters:
+        m (maze): The maze object.
+        start (tuple): Starting cell coordinates (row, col). Defaults to the bottom-right cell of the maze.
+        h (callable): Heuristic h(cell, goal) returning ints, it must be consistent (change by at
+            most 1 between neighbours) like the Manhattan distance. Defaults to 0 (Dijkstra).
+            Raises ValueError if a push lands outside the 3 levels.
+        stats (searchStats): Optional instrument.searchStats to fill in.
+
+    Returns:
+        tuple:
+            searchPath (list): Sequence of cells expanded during the search.
+            aPath (dict): A dictionary mapping each reached cell to its predecessor.
+            fwdPath (dict): A dictionary mapping the shortest path from the start cell to the goal cell.
+    """
+    start, offsets, targets, startIdx, goalIdx, hStart = _setup(m, start, h, stats)
+    goal, cols, trace = m._goal, m.cols, stats is not None
+
+    levels = ([], [], [])  # levels[f % 3][heuristic] is a stack of cells
+    lowest = [0, 0, 0]  # Smallest heuristic that may have cells, per level
+    counts = [0, 0, 0]  # Cells per level
+    levels[hStart % 3].extend([] for _ in range(hStart + 1))
+    levels[hStart % 3][hStart].append(startIdx)
+    lowest[hStart % 3] = hStart
+    counts[hStart % 3] = size = 1
+
+    parent = {}  # Cell -> predecessor
+    g_score = {startIdx: 0}  # Cost from start to the cell
+    closed = bytearray(m.rows * cols)  # Cells already expanded
+    expanded = []
+
+    f = hStart
+    while size:
+        level = f % 3
+        if not counts[level]:
+            f += 1  # Nothing left at this f_score
+            continue
+        stacks = levels[level]
+        k = lowest[level]
+        while not stacks[k]:
+            k += 1
+        lowest[level] = k
+        curr = stacks[k].pop()
+        counts[level] -= 1
+        size -= 1
+        if closed[curr]:  # Stale entry, the cell was expanded with a better f_score
+            if trace:
+                stats._stale(curr)
+            continue
+        closed[curr] = 1
+        expanded.append(curr)
+        if trace:
+            stats._expand(curr)
+
+        if curr == goalIdx:
+            break
+
+        temp_g_score = g_score[curr] + 1
+        for child in targets[offsets[curr]:offsets[curr + 1]]:  # Open neighbours, E,S,N,W
+            if closed[child]:
+                continue
+            # Update only if a better path is found, the heuristic is computed once per push
+            if temp_g_score < g_score.get(child, float('inf')):
+                parent[child] = curr
+                g_score[child] = temp_g_score
+                hChild = h((child // cols + 1, child % cols + 1), goal) if h else 0
+                fChild = temp_g_score + hChild
+                if not f <= fChild <= f + 2:
+                    raise ValueError('The heuristic must be integer and consistent for the bucket queue!')
+                level = fChild % 3
+                stacks = levels[level]
+                if hChild >= len(stacks):
+                    stacks.extend([] for _ in range(hChild + 1 - len(stacks)))
+                stacks[hChild].append(child)
+                if hChild < lowest[level] or not counts[level]:
+                    lowest[level] = hChild
+                counts[level] += 1
+                size += 1
+                if trace:
+                    stats._push(child, size)
+
+    return _result(m, start, expanded, parent, h, stats)
+
+def meetingPath(fParent, bParent, meet, startIdx, goalIdx, cols):
+    """
+    Join the two halves of a bidirectional search at the cell where they met.
+
+    Parameters:
+        fParent, bParent (dict): Flat cell -> the flat cell it was reached from, of the search from
+            the start and of the search from the goal.
+        meet (int): Flat cell on the shortest path reached by both searches.
+        startIdx, goalIdx (int): Flat start and goal cells.
+        cols (int): Columns of the maze.
+
+    Returns:
+        tuple:
+            parentMap (dict): Every reached cell mapped to the cell it was reached from, the cells on
+                the path mapped towards the start cell, so it can be walked from the goal.
+            fwdPath (dict): A dictionary mapping the shortest path from the start cell to the goal cell.
+    """
+    cells = []
+    cell = meet
+    while cell != startIdx:
+        cells.append(cell)
+        cell = fParent[cell]
+    cells.append(startIdx)
+    cells.reverse()
+    cell = meet
+    while cell != goalIdx:
+        cell = bParent[cell]
+        cells.append(cell)
+
+    # The goal side maps each cell to the cell it was reached from, the path is turned towards the start
+    parent = dict(bParent)
+    parent.update(fParent)
+    for prev, cell in zip(cells, cells[1:]):
+        parent[cell] = prev
+    toCell = lambda i: (i // cols + 1, i % cols + 1)
+    parentMap = {toCell(c): toCell(p) for c, p in parent.items()}
+    fwdPath = {toCell(prev): toCell(cell) for prev, cell in zip(cells, cells[1:])}
+    return parentMap, fwdPath
+
+def bidirectionalSearch(m, start=None, h=None):
+    """
+    Bidirectional best-first (A*) search, one search from start towards the goal of the maze
+    and one from the goal towards start, expanded alternately from the smaller open list.
+
+    Every time a search reaches a cell the other one has a g_score for, the joined cost is a
+    candidate for the shortest path mu. With an admissible heuristic no path shorter than mu
+    is left once the smallest f_score of either open list is at least mu, so the search stops there.
+
+    Parameters:
+        m (maze): The maze object.
+        start (tuple): Starting cell coordinates (row, col). Defaults to the bottom-right cell of the maze.
+        h (callable): Heuristic h(cell, target). Defaults to 0 (bidirectional Dijkstra).
+
+    Returns:
+        tuple:
+            searchPath (list): Sequence of cells expanded by both searches, interleaved.
+            aPath (dict): A dictionary mapping each reached cell to the cell it was reached from.
+                Cells on the shortest path map towards the start cell, so it can be walked from the goal like aStar.
+            fwdPath (dict): A dictionary mapping the shortest path from the start cell to the goal cell.
+    """
+    # Default start cell to bottom-right corner if not provided
+    if start is None:
+        start = (m.rows, m.cols)
+    goal = m._goal
+
+    # Cells are flat indices into the CSR adjacency of the maze
+    offsets, targets = m.adjacency()
+    cols = m.cols
+    startIdx = (start[0] - 1) * cols + start[1] - 1
+    goalIdx = (goal[0] - 1) * cols + goal[1] - 1
+
+    hStart = h(start, goal) if h else 0
+    hGoal = h(goal, start) if h else 0
+    # One (open, parent, g_score, closed, target) per direction
+    forward = ([(hStart, hStart, startIdx)], {}, {startIdx: 0}, bytearray(m.rows * cols), goal)
+    backward = ([(hGoal, hGoal, goalIdx)], {}, {goalIdx: 0}, bytearray(m.rows * cols), start)
+    expanded = []
+
+    mu = 0 if startIdx == goalIdx else float('inf')  # Cost of the best path found so far
+    meet = startIdx
+    while forward[0] and backward[0]:
+        # Stop when neither open list can still improve on mu
+        if forward[0][0][0] >= mu or backward[0][0][0] >= mu:
+            break
+
+        # Expand from the smaller open list
+        open, parent, g_score, closed, target = forward if len(forward[0]) <= len(backward[0]) else backward
+        other = backward[2] if open is forward[0] else forward[2]
+        curr = heappop(open)[2]
+        if closed[curr]:  # Stale entry, the cell was expanded with a better f_score
+            continue
+        closed[curr] = 1
+        expanded.append(curr)
+
+        temp_g_score = g_score[curr] + 1
+        for child in targets[offsets[curr]:offsets[curr + 1]]:  # Open neighbours, E,S,N,W
+            if closed[child]:
+                continue
+            # Update only if a better path is found, the heuristic is computed once per push
+            if temp_g_score < g_score.get(child, float('inf')):
+                parent[child] = curr
+                g_score[child] = temp_g_score
+                hChild = h((child // cols + 1, child % cols + 1), target) if h else 0
+                heappush(open, (temp_g_score + hChild, hChild, child))
+                # Both searches reached the child, keep the cheapest meeting
+                if child in other and temp_g_score + other[child] < mu:
+                    mu = temp_g_score + other[child]
+                    meet = child
+
+    # Back to (row, col) cells
+    toCell = lambda i: (i // cols + 1, i % cols + 1)
+    searchPath = [toCell(i) for i in expanded]
+    if mu == float('inf'):  # The searches never met, the goal cannot be reached
+        return searchPath, {toCell(c): toCell(p) for c, p in forward[1].items()}, {}
+
+    aPath, fwdPath = meetingPath(forward[1], backward[1], meet, startIdx, goalIdx, cols)
+    return searchPath, aPath, fwdPath
+
+def corridorSearch(m, start=None, h=None):
+    """
+    Best-first (A*) search on the corridor graph of the maze (see maze.corridorGraph).
+
+    Only junctions are expanded, each corridor is crossed in one step weighted by its length and
+    corridors ending in a dead end (other than the goal) are not followed at all. Start and goal
+    usually sit inside a corridor, so for every query they are spliced in as two extra nodes joined
+    to the ends of their corridors. The cells of a corridor are only walked again for the corridors
+    of the winning route.
+
+    Parameters:
+        m (maze): The maze object.
+        start (tuple): Starting cell coordinates (row, col). Defaults to the bottom-right cell of the maze.
+        h (callable): Heuristic h(cell, goal). Defaults to 0 (Dijkstra).
+
+    Returns:
+        tuple:
+            searchPath (list): Sequence of junction cells expanded during the search.
+            aPath (dict): A dictionary mapping each reached junction to the one it was reached from.
+                The cells of the shortest path map to the cell before them, so it can be walked from the goal like aStar.
+            fwdPath (dict): A dictionary mapping the shortest path from the start cell to the goal cell.
+    """
+    # Default start cell to bottom-right corner if not provided
+    if start is None:
+        start = (m.rows, m.cols)
+    goal = m._goal
+
+    offsets, targets = m.adjacency()
+    node, cells, cOffsets, cTargets, weights, first = m.corridorGraph()
+    cols = m.cols
+    startIdx = (start[0] - 1) * cols + start[1] - 1
+    goalIdx = (goal[0] - 1) * cols + goal[1] - 1
+
+    # Start and goal get their own node id when they are inside a corridor
+    nodes = len(cells)
+    S = node[startIdx] if node[startIdx] >= 0 else nodes
+    G = node[goalIdx] if node[goalIdx] >= 0 else S if goalIdx == startIdx else nodes + 1
+    cellOf = lambda u: startIdx if u == S else goalIdx if u == G else cells[u]
+
+    def corridorEnds(cell, stop):
+        # Walk both ways along the corridor of cell to the node (or stop cell) at each end
+        ends = []
+        for c in targets[offsets[cell]:offsets[cell + 1]]:
+            prev, cur, steps = cell, c, 1
+            while node[cur] < 0 and cur != stop and cur != cell:
+                k = offsets[cur]
+                prev, cur = cur, targets[k] if targets[k] != prev else targets[k + 1]
+                steps += 1
+            if cur != cell:  # Not a ring without any junction
+                ends.append((cur, steps, c, prev))
+        return ends
+
+    # Extra corridors: start -> ends of its corridor (or straight to the goal), ends of the goal corridor -> goal
+    startEdges = []
+    if S == nodes:
+        for cur, steps, c, prev in corridorEnds(startIdx, goalIdx):
+            startEdges.append((G if cur == goalIdx else node[cur], steps, c))
+    goalEdges = {}
+    if G == nodes + 1:
+        for cur, steps, c, prev in corridorEnds(goalIdx, -1):
+            goalEdges.setdefault(node[cur], []).append((steps, prev))
+
+    hStart = h(start, goal) if h else 0
+    open = [(hStart, hStart, S)]  # (f_score, heuristic, node)
+
+    parent = {}  # Node -> (predecessor node, first cell of the corridor taken)
+    g_score = {S: 0}  # Cost from start to the node
+    closed = bytearray(nodes + 2)  # Nodes already expanded
+    expanded = []
+
+    while open:
+        curr = heappop(open)[2]
+        if closed[curr]:  # Stale entry, the node was expanded with a better f_score
+            continue
+        closed[curr] = 1
+        expanded.append(curr)
+
+        if curr == G:
+            break
+
+        if curr == nodes:
+            edges = startEdges
+        else:
+            edges = [(cTargets[k], weights[k], first[k]) for k in range(cOffsets[curr], cOffsets[curr + 1])]
+        for steps, c in goalEdges.get(curr, ()):
+            edges.append((G, steps, c))
+
+        for child, steps, c in edges:
+            if closed[child]:
+                continue
+            # A dead end other than the goal cannot be on the way, it is never pushed
+            if child < nodes and child != G and cOffsets[child + 1] - cOffsets[child] < 2:
+                continue
+            # Update only if a better path is found, the heuristic is computed once per push
+            temp_g_score = g_score[curr] + steps
+            if temp_g_score < g_score.get(child, float('inf')):
+                parent[child] = (curr, c)
+                g_score[child] = temp_g_score
+                cell = cellOf(child)
+                hChild = h((cell // cols + 1, cell % cols + 1), goal) if h else 0
+                heappush(open, (temp_g_score + hChild, hChild, child))
+
+    # Back to (row, col) cells
+    toCell = lambda i: (i // cols + 1, i % cols + 1)
+    searchPath = [toCell(cellOf(u)) for u in expanded]
+    aPath = {toCell(cellOf(v)): toCell(cellOf(u)) for v, (u, c) in parent.items()}
+    if G not in parent and G != S:  # The goal cannot be reached
+        return searchPath, aPath, {}
+
+    # Expand the winning corridors back to cells, goal to start
+    route = []
+    v = G
+    while v != S:
+        u, c = parent[v]
+        end = cellOf(v)
+        corridor = [cellOf(u), c]
+        while corridor[-1] != end:
+            cur = corridor[-1]
+            k = offsets[cur]
+            corridor.append(targets[k] if targets[k] != corridor[-2] else targets[k + 1])
+        route.append(corridor)
+        v = u
+    pathCells = [startIdx]
+    for corridor in reversed(route):
+        pathCells.extend(corridor[1:])
+
+    fwdPath = {}
+    for prev, cell in zip(pathCells, pathCells[1:]):
+        aPath[toCell(cell)] = toCell(prev)
+        fwdPath[toCell(prev)] = toCell(cell)
+
+    return searchPath, aPath, fwdPath